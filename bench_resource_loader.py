@@ -0,0 +1,61 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from resource_loader import load_resources
+
+# Times load_resources on generated AssetType files without a cache, with a cold
+# cache and with a warm cache, both for a full load and a validation-only load
+def write_resources(directory, count):
+    asset_type_dir = os.path.join(directory, 'resources', 'AssetType')
+    os.makedirs(asset_type_dir)
+    for number in range(count):
+        with open(os.path.join(asset_type_dir, f"asset_type_{number}.json"), 'w') as f:
+            json.dump({
+                'id': f"11111111-0000-0000-0000-{number:012d}",
+                'name': f"Asset Type {number}",
+                'parent_id': '00000000-0000-0000-0000-000000031301',
+                'description': "Generated asset type " * 10,
+                'symbol_type': 'NONE',
+                'display_name_enabled': False,
+                'rating_enabled': False
+            }, f)
+
+def best_of(runs, **kwargs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        load_resources(**kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resource loader cache.")
+    parser.add_argument('--files', type=int, default=5000, help="Number of generated resource files")
+    parser.add_argument('--runs', type=int, default=5, help="Number of runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_resources(directory, args.files)
+        os.chdir(directory)
+        cache_path = os.path.join(directory, 'cache.json')
+
+        for load_data in (True, False):
+            label = "full load" if load_data else "validation only"
+            no_cache = best_of(args.runs, cache_path=None, load_data=load_data)
+
+            cold = []
+            for _ in range(args.runs):
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+                start = time.perf_counter()
+                load_resources(cache_path=cache_path, load_data=load_data)
+                cold.append(time.perf_counter() - start)
+
+            warm = best_of(args.runs, cache_path=cache_path, load_data=load_data)
+            print(f"{label:<16} no cache {no_cache:.3f}s  cold cache {min(cold):.3f}s  warm cache {warm:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+
+# Measures how long each importer script takes to start (`--help`) and which
+# heavy modules get pulled in by a bare import of the script module
+SCRIPTS = ['openAPIv2', 'install_operating_model']
+HEAVY_MODULES = ['collibra_core', 'collibra_importer', 'yaml', 'tabulate']
+
+def time_command(command, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def loaded_heavy_modules(script):
+    code = (
+        f"import sys, {script}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        return "import failed"
+    return result.stdout.strip() or "none"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of the importer scripts.")
+    parser.add_argument('--runs', type=int, default=10, help="Number of runs per script")
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, '-c', 'pass'], args.runs)
+    print(f"{'interpreter':<32} min {min(baseline) * 1000:7.1f} ms  median {statistics.median(baseline) * 1000:7.1f} ms")
+
+    for script in SCRIPTS:
+        timings = time_command([sys.executable, f"{script}.py", '--help'], args.runs)
+        print(f"{script + ' --help':<32} min {min(timings) * 1000:7.1f} ms  median {statistics.median(timings) * 1000:7.1f} ms"
+              f"  heavy modules on import: {loaded_heavy_modules(script)}")
+
+if __name__ == "__main__":
+    main()
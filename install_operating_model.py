@@ -1,56 +1,42 @@
 from __future__ import print_function
-import time
-import collibra_core
-from collibra_core.rest import ApiException
-from pprint import pprint
 import json
-import os
-from tabulate import tabulate
-import logging.config
-import yaml
+import argparse
+import logging
+
+from resource_loader import CACHE_FILE, load_resources
+from logging_utils import SAMPLED, add_logging_arguments, configure_logging
+from target_config import add_target_arguments, read_targets
+
+# collibra_core, tabulate and yaml are imported lazily so that --help does not
+# pay for loading them; the SDK is only needed once an installer action runs
+logger = logging.getLogger('production')
+
+# Populated by load_sdk()
+collibra_core = None
+ApiException = None
+
+def load_sdk():
+    global collibra_core, ApiException
+    import collibra_core
+    from collibra_core.rest import ApiException
 
 # Setup logger
-def setup_logger():
-
-    with open('logging_config.yaml', 'rt') as f:
-        logging_config = yaml.safe_load(f.read())
-
-    logging.config.dictConfig(logging_config)
-    logger = logging.getLogger('production')
-
-    return logger
-
-logger = setup_logger()
-
-with open('config.json') as config_file:
-    config = json.load(config_file)
-
-# Configure HTTP basic authorization: basicAuth
-configuration = collibra_core.Configuration()
-configuration.host = config['url']
-configuration.username = config['username']
-configuration.password = config['password']
-
-def load_json_files_from_directory(directory_path, required_fields, stats):
-    if not os.path.exists(directory_path):
-        return []
-
-    json_files = []
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.json'):
-            with open(os.path.join(directory_path, filename)) as file:
-                try:
-                    data = json.load(file)
-                    missing_fields = [field for field in required_fields if field not in data]
-                    if missing_fields:
-                        logger.error(f"File {filename} is missing required fields: {missing_fields}")
-                        stats['errors'] += 1
-                    else:
-                        json_files.append(data)
-                except json.JSONDecodeError:
-                    logger.error(f"File {filename} is not a valid JSON")
-                    stats['errors'] += 1
-    return json_files
+def setup_logger(args):
+    return configure_logging(
+        'production',
+        async_logging=args.async_logging,
+        sample_rate=args.log_sample_rate,
+        json_format=args.log_format == 'json'
+    )
+
+def build_configuration(config):
+    # Configure HTTP basic authorization: basicAuth
+    configuration = collibra_core.Configuration()
+    configuration.host = config['url']
+    configuration.username = config['username']
+    configuration.password = config['password']
+
+    return configuration
 
 def build_asset_type_request(asset, optional_fields, is_change_request=False, existing_asset_id=None):
     request_class = collibra_core.ChangeAssetTypeRequest if is_change_request else collibra_core.AddAssetTypeRequest
@@ -121,7 +107,6 @@ def build_relation_type_request(relation_type, optional_fields, is_change_reques
     return request
 
 def build_assignment_request(assignment, optional_fields, is_change_request=False, existing_assignment_id=None):
-
     request = collibra_core.AddAssignmentRequest(
         asset_type_id=assignment['asset_type_id'],
         status_ids=assignment['status_ids'],
@@ -166,10 +151,8 @@ def build_assignment_request(assignment, optional_fields, is_change_request=Fals
 
     return request
 
-def create_or_update_asset(api_client, asset, optional_fields, stats):
+def create_or_update_asset(api_instance, asset, optional_fields, stats):
     try:
-        api_instance = collibra_core.AssetTypesApi(api_client)
-
         if 'id' in asset:
             try:
                 existing_asset = api_instance.get_asset_type(asset['id'])
@@ -177,7 +160,7 @@ def create_or_update_asset(api_client, asset, optional_fields, stats):
                     # Update existing asset type
                     change_asset_type_request = build_asset_type_request(asset, optional_fields, True, existing_asset.id)
                     api_response = api_instance.change_asset_type(existing_asset.id, body=change_asset_type_request)
-                    logger.info("Asset updated: %s", api_response)
+                    logger.info("Asset updated: %s", api_response, extra=SAMPLED)
                     stats['updated'] += 1
                     return
             except ApiException as e:
@@ -194,22 +177,20 @@ def create_or_update_asset(api_client, asset, optional_fields, stats):
             existing_asset_id = existing_assets[0].id
             change_asset_type_request = build_asset_type_request(asset, optional_fields, True, existing_asset_id)
             api_response = api_instance.change_asset_type(existing_asset_id, body=change_asset_type_request)
-            logger.info("Asset updated: %s", api_response)
+            logger.info("Asset updated: %s", api_response, extra=SAMPLED)
             stats['updated'] += 1
         else:
             # Create new asset type
             add_asset_type_request = build_asset_type_request(asset, optional_fields)
             api_response = api_instance.add_asset_type(body=add_asset_type_request)
-            logger.info("Asset added: %s", api_response)
+            logger.info("Asset added: %s", api_response, extra=SAMPLED)
             stats['created'] += 1
     except ApiException as e:
         logger.error("Exception when calling AssetTypesApi: %s", e.body)
         stats['errors'] += 1
 
-def create_or_update_community(api_client, community, optional_fields, stats):
+def create_or_update_community(api_instance, community, optional_fields, stats):
     try:
-        api_instance = collibra_core.CommunitiesApi(api_client)
-
         if 'id' in community:
             try:
                 existing_community = api_instance.get_community(community['id'])
@@ -217,7 +198,7 @@ def create_or_update_community(api_client, community, optional_fields, stats):
                     # Update existing community
                     change_community_request = build_community_request(community, optional_fields, True, existing_community.id)
                     api_response = api_instance.change_community(existing_community.id, body=change_community_request)
-                    logger.info("Community updated: %s", api_response)
+                    logger.info("Community updated: %s", api_response, extra=SAMPLED)
                     stats['updated'] += 1
                     return
             except ApiException as e:
@@ -234,13 +215,13 @@ def create_or_update_community(api_client, community, optional_fields, stats):
             existing_community_id = existing_communities[0].id
             change_community_request = build_community_request(community, optional_fields, True, existing_community_id)
             api_response = api_instance.change_community(existing_community_id, body=change_community_request)
-            logger.info("Community updated: %s", api_response)
+            logger.info("Community updated: %s", api_response, extra=SAMPLED)
             stats['updated'] += 1
         else:
             # Create new community
             add_community_request = build_community_request(community, optional_fields)
             api_response = api_instance.add_community(body=add_community_request)
-            logger.info("Community added: %s", api_response)
+            logger.info("Community added: %s", api_response, extra=SAMPLED)
             stats['created'] += 1
     except ApiException as e:
         logger.error("Exception when calling CommunitiesApi: %s", e.body)
@@ -254,7 +235,7 @@ def create_or_update_domain(api_instance, item, optional_fields, stats):
                 if existing_item:
                     change_item_request = build_domain_request(item, optional_fields, True, existing_item.id)
                     api_response = api_instance.change_domain(existing_item.id, body=change_item_request)
-                    logger.info("Domain updated: %s", api_response)
+                    logger.info("Domain updated: %s", api_response, extra=SAMPLED)
                     stats['updated'] += 1
                     return
             except ApiException as e:
@@ -272,13 +253,13 @@ def create_or_update_domain(api_instance, item, optional_fields, stats):
             existing_item_id = existing_items[0].id
             change_item_request = build_domain_request(item, optional_fields, True, existing_item_id)
             api_response = api_instance.change_domain(existing_item_id, body=change_item_request)
-            logger.info("Domain updated: %s", api_response)
+            logger.info("Domain updated: %s", api_response, extra=SAMPLED)
             stats['updated'] += 1
         else:
             # Create new item
             add_item_request = build_domain_request(item, optional_fields)
             api_response = api_instance.add_domain(body=add_item_request)
-            logger.info("Domain added: %s", api_response)
+            logger.info("Domain added: %s", api_response, extra=SAMPLED)
             stats['created'] += 1
     except ApiException as e:
         logger.error("Exception when calling DomainsApi: %s", e.body)
@@ -292,7 +273,7 @@ def create_or_update_relation_type(api_instance, item, optional_fields, stats):
                 if existing_item:
                     change_item_request = build_relation_type_request(item, optional_fields, True, existing_item.id)
                     api_response = api_instance.change_relation_type(existing_item.id, body=change_item_request)
-                    logger.info("Relation Type updated: %s", api_response)
+                    logger.info("Relation Type updated: %s", api_response, extra=SAMPLED)
                     stats['updated'] += 1
                     return
             except ApiException as e:
@@ -304,7 +285,7 @@ def create_or_update_relation_type(api_instance, item, optional_fields, stats):
         # Create new item
         add_item_request = build_relation_type_request(item, optional_fields)
         api_response = api_instance.add_relation_type(body=add_item_request)
-        logger.info("Relation type added: %s", api_response)
+        logger.info("Relation type added: %s", api_response, extra=SAMPLED)
         stats['created'] += 1
 
     except ApiException as e:
@@ -317,7 +298,7 @@ def create_or_update_assignment(api_instance, item, optional_fields, stats):
             try:
                 change_item_request = build_assignment_request(item, optional_fields, True, item['id'])
                 api_response = api_instance.change_assignment(item['id'], body=change_item_request)
-                logger.info("Assignment updated: %s", api_response)
+                logger.info("Assignment updated: %s", api_response, extra=SAMPLED)
                 stats['updated'] += 1
                 return
             except AttributeError as e:
@@ -332,7 +313,7 @@ def create_or_update_assignment(api_instance, item, optional_fields, stats):
         # Create new item
         add_item_request = build_assignment_request(item, optional_fields)
         api_response = api_instance.add_assignment(body=add_item_request)
-        logger.info("Assignment added: %s", api_response)
+        logger.info("Assignment added: %s", api_response, extra=SAMPLED)
         stats['created'] += 1
     except AttributeError as e:
         stats['created'] += 1
@@ -340,62 +321,106 @@ def create_or_update_assignment(api_instance, item, optional_fields, stats):
         logger.error("Exception when calling DomainsApi: %s", e.body)
         stats['errors'] += 1
 
-def create_assets(api_client, stats):
-    required_fields = ['name', 'symbol_type', 'display_name_enabled', 'rating_enabled']
+def create_assets(api_client, assets, stats):
+    api_instance = collibra_core.AssetTypesApi(api_client)
     optional_fields = ['id', 'description', 'parent_id', 'color', 'icon_code', 'acronym_code']
-    assets = load_json_files_from_directory('resources/AssetType', required_fields, stats)
     for asset in assets:
-        create_or_update_asset(api_client, asset, optional_fields, stats)
+        create_or_update_asset(api_instance, asset, optional_fields, stats)
 
-def create_communities(api_client, stats):
-    required_fields = ['name']
+def create_communities(api_client, communities, stats):
+    api_instance = collibra_core.CommunitiesApi(api_client)
     optional_fields = ['description', 'parent_id', 'id']
-    communities = load_json_files_from_directory('resources/Community', required_fields, stats)
     for community in communities:
-        create_or_update_community(api_client, community, optional_fields, stats)
+        create_or_update_community(api_instance, community, optional_fields, stats)
 
-def create_domains(api_client, stats):
-    required_fields = ['name', 'community_id', 'type_id']
+def create_domains(api_client, domains, stats):
+    api_instance = collibra_core.DomainsApi(api_client)
     optional_fields = ['description', 'excluded_from_auto_hyperlinking', 'id']
-    domains = load_json_files_from_directory('resources/Domain', required_fields, stats)
     for domain in domains:
-        create_or_update_domain(collibra_core.DomainsApi(api_client), domain, optional_fields, stats)
+        create_or_update_domain(api_instance, domain, optional_fields, stats)
 
-def create_relation_types(api_client, stats):
-    required_fields = ['source_type_id', 'role', 'target_type_id', 'co_role']
+def create_relation_types(api_client, relation_types, stats):
+    api_instance = collibra_core.RelationTypesApi(api_client)
     optional_fields = ['description', 'id']
-    relation_types = load_json_files_from_directory('resources/RelationType', required_fields, stats)
     for relation_type in relation_types:
-        create_or_update_relation_type(collibra_core.RelationTypesApi(api_client), relation_type, optional_fields, stats)
+        create_or_update_relation_type(api_instance, relation_type, optional_fields, stats)
 
-def create_assignments(api_client, stats):
-    required_fields = ['asset_type_id', 'status_ids', 'default_status_id']
+def create_assignments(api_client, assignments, stats):
+    api_instance = collibra_core.AssignmentsApi(api_client)
     optional_fields = ['id', 'characteristic_types', 'articulation_rules', 'validation_rule_ids', 'data_quality_rule_ids', 'domain_type_ids', 'scope_id']
-    relation_types = load_json_files_from_directory('resources/Assignment', required_fields, stats)
-    for relation_type in relation_types:
-        create_or_update_assignment(collibra_core.AssignmentsApi(api_client), relation_type, optional_fields, stats)
+    for assignment in assignments:
+        create_or_update_assignment(api_instance, assignment, optional_fields, stats)
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or greater, got {number}")
+    return number
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Install the operating model resources into Collibra.")
+    parser.add_argument('--config', default='config.json', help="Path to the configuration file")
+    parser.add_argument('--workers', type=positive_int, default=None, help="Number of threads used to load resource files")
+    parser.add_argument('--no-cache', action='store_true', help="Parse every resource file, ignoring the parse cache")
+    parser.add_argument('--dry-run', action='store_true', help="Validate the resource files without calling the Collibra API")
+    add_target_arguments(parser)
+    add_logging_arguments(parser)
+    return parser.parse_args(argv)
 
 def main():
-    stats = {
-        'assets': {'created': 0, 'updated': 0, 'errors': 0},
-        'communities': {'created': 0, 'updated': 0, 'errors': 0},
-        'domains': {'created': 0, 'updated': 0, 'errors': 0},
-        'relation_types': {'created': 0, 'updated': 0, 'errors': 0},
-        'assignments': {'created': 0, 'updated': 0, 'errors': 0}
-    }
-
-    api_client = collibra_core.ApiClient(configuration)
-    create_assets(api_client, stats['assets'])
-    create_communities(api_client, stats['communities'])
-    create_domains(api_client, stats['domains'])
-    create_relation_types(api_client, stats['relation_types'])
-    create_assignments(api_client, stats['assignments'])
+    args = parse_args()
+    setup_logger(args)
 
-    stats_table = []
-    for category, values in stats.items():
-        stats_table.append([category, values['created'], values['updated'], values['errors']])
+    with open(args.config) as config_file:
+        config = json.load(config_file)
+
+    try:
+        targets = read_targets(config, args.targets)
+    except ValueError as e:
+        logger.error(e)
+        return
+
+    from tabulate import tabulate
+
+    resources, errors, warnings = load_resources(
+        max_workers=args.workers,
+        cache_path=None if args.no_cache else CACHE_FILE,
+        known_ids=config.get('known_ids', []),
+        load_data=not args.dry_run
+    )
+
+    for messages in warnings.values():
+        for message in messages:
+            logger.warning(message)
+
+    stats = {}
+    for category, failed_files in errors.items():
+        for messages in failed_files.values():
+            for message in messages:
+                logger.error(message)
+        stats[category] = {'created': 0, 'updated': 0, 'errors': len(failed_files)}
 
-    print(tabulate(stats_table, headers=["Category", "Created", "Updated", "Failed"], tablefmt="pretty"))
+    if args.dry_run:
+        stats_table = [[category, len(resources[category]), values['errors']] for category, values in stats.items()]
+        print(tabulate(stats_table, headers=["Category", "Valid", "Failed"], tablefmt="pretty"))
+        return
+
+    # Resources are loaded and validated once, then installed into each target in turn
+    load_sdk()
+    stats_table = []
+    for target in targets:
+        target_stats = {category: dict(values) for category, values in stats.items()}
+        api_client = collibra_core.ApiClient(build_configuration(target))
+        create_assets(api_client, resources['assets'], target_stats['assets'])
+        create_communities(api_client, resources['communities'], target_stats['communities'])
+        create_domains(api_client, resources['domains'], target_stats['domains'])
+        create_relation_types(api_client, resources['relation_types'], target_stats['relation_types'])
+        create_assignments(api_client, resources['assignments'], target_stats['assignments'])
+
+        for category, values in target_stats.items():
+            stats_table.append([target['name'], category, values['created'], values['updated'], values['errors']])
+
+    print(tabulate(stats_table, headers=["Target", "Category", "Created", "Updated", "Failed"], tablefmt="pretty"))
 
 if __name__ == "__main__":
     main()
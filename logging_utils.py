@@ -0,0 +1,73 @@
+import json
+import atexit
+import queue
+import itertools
+import logging.config
+import logging.handlers
+
+# Pass as `extra` on per-object success logs so they can be sampled
+SAMPLED = {'sampled': True}
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    # The default QueueHandler formats every record on the calling thread.
+    # The queue never leaves the process, so hand the record over untouched and
+    # let the listener thread build the message only if a handler emits it.
+    def prepare(self, record):
+        return record
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.counter = itertools.count()
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False):
+            return True
+        return next(self.counter) % self.sample_rate == 0
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, self.datefmt),
+            'logger': record.name,
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def configure_logging(logger_name, config_path='logging_config.yaml', async_logging=False, sample_rate=1, json_format=False):
+    import yaml
+
+    with open(config_path, 'rt') as f:
+        logging_config = yaml.safe_load(f.read())
+
+    logging.config.dictConfig(logging_config)
+    logger = logging.getLogger(logger_name)
+
+    if json_format:
+        for handler in logger.handlers:
+            handler.setFormatter(JsonFormatter(datefmt='%Y-%m-%d %H:%M:%S'))
+
+    if sample_rate > 1:
+        logger.addFilter(SamplingFilter(sample_rate))
+
+    if async_logging:
+        # Worker threads only enqueue records; formatting and file I/O happen on the listener thread
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(LazyQueueHandler(log_queue))
+        listener.start()
+        atexit.register(listener.stop)
+
+    return logger
+
+def add_logging_arguments(parser):
+    parser.add_argument('--async-logging', action='store_true', help="Format and write log records on a background thread")
+    parser.add_argument('--log-sample-rate', type=int, default=1, help="Log only every Nth per-object success message")
+    parser.add_argument('--log-format', choices=['text', 'json'], default='text', help="Log output format")
@@ -1,29 +1,27 @@
-import sys
 import json
-import logging.config
-import yaml
+import logging
 import os
 import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from collibra_importer.api_client import Configuration as Collibra_Importer_Api_Client_Config
-from collibra_importer.api_client import ApiClient as Collibra_Importer_Api_Client
-from collibra_importer.api import import_api
+from logging_utils import add_logging_arguments, configure_logging
+from target_config import add_target_arguments, read_targets
 
-from collibra_core.api_client import Configuration as Collibra_Core_Api_Client_Config
-from collibra_core.api_client import ApiClient as Collibra_Core_Api_Client
-from collibra_core.api import jobs_api
+# Collibra SDK clients and yaml are imported lazily so that --help and dry runs
+# do not pay for loading them
+logger = logging.getLogger('development')
 
 # Setup logger
-def setup_logger():
-    with open('logging_config.yaml', 'rt') as f:
-        logging_config = yaml.safe_load(f.read())
-
-    logging.config.dictConfig(logging_config)
-    logger = logging.getLogger('development')
-
-    return logger
-
-logger = setup_logger()
+def setup_logger(args):
+    return configure_logging(
+        'development',
+        async_logging=args.async_logging,
+        sample_rate=args.log_sample_rate,
+        json_format=args.log_format == 'json'
+    )
 
 def read_json_file(file_path):
     try:
@@ -50,46 +48,150 @@ def read_config_file(file_path):
         logger.error(f"Error reading config file '{file_path}': {e}")
         return None
 
-def send_import_data(import_data, properties):
-    temp_filename = 'temp_import_data.json'
+class RateLimiter:
+    def __init__(self, requests_per_second=None):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0
+        self.lock = threading.Lock()
+        self.next_call = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if self.next_call > now:
+                time.sleep(self.next_call - now)
+                now = self.next_call
+            self.next_call = now + self.interval
+
+def asset_key(identifier):
+    domain = identifier.get('domain', {})
+    return identifier.get('name'), domain.get('name'), domain.get('community', {}).get('name')
+
+def chunk_import_data(import_data, chunk_size):
+    if not chunk_size:
+        return [import_data]
+
+    # Latest position each resource points to through its relations. A chunk is
+    # only closed when nothing in it (or before it) points at a later resource,
+    # so chunks may grow past chunk_size to keep related assets together.
+    positions = {}
+    for index, resource in enumerate(import_data):
+        positions.setdefault(asset_key(resource.get('identifier', {})), index)
+
+    chunks = []
+    start = 0
+    reach = 0
+    for index, resource in enumerate(import_data):
+        for related in resource.get('relations', {}).values():
+            for target in related:
+                reach = max(reach, positions.get(asset_key(target), 0))
+        if index + 1 - start >= chunk_size and reach <= index:
+            chunks.append(import_data[start:index + 1])
+            start = index + 1
+
+    if start < len(import_data):
+        chunks.append(import_data[start:])
+
+    return chunks
+
+def write_chunk_files(chunks):
+    # Chunks are serialized once and the same files are uploaded to every target
+    chunk_files = []
+    for chunk in chunks:
+        fd, temp_filename = tempfile.mkstemp(prefix='import_data_', suffix='.json', dir='.')
+        with os.fdopen(fd, 'w') as temp_file:
+            json.dump(chunk, temp_file)
+        chunk_files.append(temp_filename)
+    return chunk_files
+
+def send_import_data(temp_filename, import_api_instance, jobs_api_instance, rate_limiter, target_name):
+    rate_limiter.wait()
+    response = import_api_instance.import_json_in_job(file_name=os.path.basename(temp_filename), file=temp_filename)
+    logger.info("[%s] Import data sent successfully: %s", target_name, response.id)
+
+    while response.state not in {"COMPLETED", "CANCELED", "ERROR"}:
+        time.sleep(1)
+        rate_limiter.wait()
+        response = jobs_api_instance.get_job(job_id=response.id)
+        logger.info("[%s] Job state: %s", target_name, response.state)
+
+    return response
+
+def upload_to_target(target, chunk_files):
+    from collibra_importer.api_client import Configuration as Collibra_Importer_Api_Client_Config
+    from collibra_importer.api_client import ApiClient as Collibra_Importer_Api_Client
+    from collibra_importer.api import import_api
+    from collibra_core.api import jobs_api
+
+    results = []
     try:
-        with open(temp_filename, 'w') as temp_file:
-            json.dump(import_data, temp_file)
-
         collibra_config = Collibra_Importer_Api_Client_Config()
-        collibra_config.host = properties['url']
-        collibra_config.username = properties['username']
-        collibra_config.password = properties['password']
+        collibra_config.host = target['url']
+        collibra_config.username = target['username']
+        collibra_config.password = target['password']
 
         api_client = Collibra_Importer_Api_Client(collibra_config)
         import_api_instance = import_api.ImportApi(api_client)
         jobs_api_instance = jobs_api.JobsApi(api_client)
-
-        response = import_api_instance.import_json_in_job(file_name=temp_filename, file=temp_filename)
-        logger.info(f"Import data sent successfully: {response.id}")
-
-        while response.state not in {"COMPLETED", "CANCELED", "ERROR"}:
-            time.sleep(1)
-            response = jobs_api_instance.get_job(job_id=response.id)
-            logger.info(f"Job state: {response.state}")
-
+        rate_limiter = RateLimiter(target.get('rate_limit'))
     except Exception as e:
-        logger.error(f"Error sending import data: {e}")
+        logger.error("[%s] Error creating API client: %s", target['name'], e)
+        return [[target['name'], index + 1, None, "ERROR", 0.0] for index in range(len(chunk_files))]
+
+    # Chunks go out in order: later chunks may relate to assets created by earlier
+    # ones, so the sequence stops at the first chunk that does not complete
+    for index, temp_filename in enumerate(chunk_files):
+        start = time.monotonic()
+        try:
+            response = send_import_data(temp_filename, import_api_instance, jobs_api_instance, rate_limiter, target['name'])
+            results.append([target['name'], index + 1, response.id, response.state, time.monotonic() - start])
+            completed = response.state == "COMPLETED"
+        except Exception as e:
+            logger.error("[%s] Error sending import data: %s", target['name'], e)
+            results.append([target['name'], index + 1, None, "ERROR", time.monotonic() - start])
+            completed = False
+
+        if not completed:
+            skipped = range(index + 1, len(chunk_files))
+            if skipped:
+                logger.error("[%s] Chunk %s did not complete, skipping %s remaining chunks", target['name'], index + 1, len(skipped))
+            results.extend([target['name'], skipped_index + 1, None, "SKIPPED", 0.0] for skipped_index in skipped)
+            break
+
+    return results
+
+def send_to_targets(import_data, targets, chunk_size):
+    from tabulate import tabulate
+
+    chunk_files = write_chunk_files(chunk_import_data(import_data, chunk_size))
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            for target_results in executor.map(lambda target: upload_to_target(target, chunk_files), targets):
+                results.extend(target_results)
     finally:
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
+        for temp_filename in chunk_files:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+    table = [[name, chunk, job_id, state, f"{duration:.1f}s"] for name, chunk, job_id, state, duration in results]
+    print(tabulate(table, headers=["Target", "Chunk", "Job", "State", "Duration"], tablefmt="pretty"))
 
-def get_references(schema):
+    return results
+
+def get_references(schema, prefix=None):
     refs = set()
     if isinstance(schema, dict):
         for key, value in schema.items():
             if key == '$ref':
-                refs.add(value.split('/')[-1])
+                if prefix is None or value.startswith(prefix):
+                    refs.add(value.split('/')[-1])
             else:
-                refs.update(get_references(value))
+                refs.update(get_references(value, prefix))
     elif isinstance(schema, list):
         for item in schema:
-            refs.update(get_references(item))
+            refs.update(get_references(item, prefix))
     return refs
 
 def process_schemas(json_data, domain_name, community_name):
@@ -198,18 +300,72 @@ def add_reference_relation(prop_json, ref, community_name, domain_name):
         }
     })
 
+HTTP_METHODS = {'get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace'}
+
+def lookup_reference(json_data, ref):
+    node = json_data
+    for part in ref.lstrip('#/').split('/'):
+        part = part.replace('~1', '/').replace('~0', '~')
+        if not isinstance(node, dict) or part not in node:
+            logger.error(f"Unresolvable reference: {ref}")
+            return {}
+        node = node[part]
+    return node
+
+def resolve_component(json_data, component, component_cache):
+    # Shared components (parameters, requestBodies) are resolved and scanned for
+    # schema references once, then reused by every endpoint that points at them
+    ref = component.get('$ref')
+    if ref is None:
+        return component, get_component_references(component)
+    if ref not in component_cache:
+        resolved = lookup_reference(json_data, ref)
+        component_cache[ref] = (resolved, get_component_references(resolved))
+    return component_cache[ref]
+
+def get_component_references(component):
+    # Only schemas become relations; $refs under examples, encoding or headers do not
+    refs = get_references(component.get('schema', {}), '#/components/schemas/')
+    for media_type_content in component.get('content', {}).values():
+        if 'schema' in media_type_content:
+            refs.update(get_references(media_type_content['schema'], '#/components/schemas/'))
+    return refs
+
+def merge_parameters(json_data, path_parameters, operation_parameters, component_cache):
+    # Operation-level parameters override path-level ones with the same name and location
+    merged = {}
+    for parameter in path_parameters + operation_parameters:
+        resolved, refs = resolve_component(json_data, parameter, component_cache)
+        if 'name' not in resolved:
+            continue
+        merged[(resolved['name'], resolved.get('in', ''))] = (resolved, refs)
+    return list(merged.values())
+
 def process_paths(json_data, title, config_data, community_name, domains):
     paths = json_data.get('paths', {})
     import_data = []
+    component_cache = {}
 
     for path, details in paths.items():
+        path_parameters = details.get('parameters', [])
         for method, method_details in details.items():
+            if method not in HTTP_METHODS:
+                continue
+
             endpoint_name = method.upper() + " " + path
             endpoint_description = method_details.get('description', '')
 
             json_object = create_endpoint_asset(endpoint_name, endpoint_description, title, config_data, community_name, domains)
             import_data.append(json_object)
 
+            parameters = merge_parameters(json_data, path_parameters, method_details.get('parameters', []), component_cache)
+            parameters_assets = process_parameters(title, endpoint_name, parameters, community_name, domains)
+            import_data.extend(parameters_assets)
+
+            if 'requestBody' in method_details:
+                request_body, refs = resolve_component(json_data, method_details['requestBody'], component_cache)
+                import_data.append(process_request_body(title, endpoint_name, request_body, refs, community_name, domains))
+
             responses_assets = process_responses(title, endpoint_name, method_details.get('responses', {}), community_name, domains)
             import_data.extend(responses_assets)
 
@@ -252,6 +408,75 @@ def create_endpoint_asset(endpoint_name, endpoint_description, title, config_dat
         }
     }
 
+def process_parameters(title, endpoint_name, parameters, community_name, domains):
+    parameters_assets = []
+    for parameter, refs in parameters:
+        json_object = create_endpoint_child_asset(
+            '>'.join([title, endpoint_name, parameter.get('in', ''), parameter['name']]),
+            parameter['name'],
+            "Data Element",
+            parameter.get('description', ''),
+            endpoint_name,
+            community_name,
+            domains
+        )
+        for ref in refs:
+            add_reference_relation(json_object, f"#/components/schemas/{ref}", community_name, domains.get("data_assets"))
+        parameters_assets.append(json_object)
+    return parameters_assets
+
+def process_request_body(title, endpoint_name, request_body, refs, community_name, domains):
+    json_object = create_endpoint_child_asset(
+        '>'.join([title, endpoint_name, "requestBody"]),
+        "request body",
+        "Data Structure",
+        request_body.get('description', ''),
+        endpoint_name,
+        community_name,
+        domains
+    )
+    for ref in refs:
+        add_reference_relation(json_object, f"#/components/schemas/{ref}", community_name, domains.get("data_assets"))
+    return json_object
+
+def create_endpoint_child_asset(name, display_name, type_name, description, endpoint_name, community_name, domains):
+    return {
+        "resourceType": "Asset",
+        "identifier": {
+            "name": name,
+            "domain": {
+                "name": domains.get("data_assets"),
+                "community": {
+                    "name": community_name
+                }
+            }
+        },
+        "displayName": display_name,
+        "type": {
+            "name": type_name
+        },
+        "attributes": {
+            "Description": [
+                {
+                    "value": description
+                }
+            ]
+        },
+        "relations": {
+            "00000000-0000-0000-0000-000000007017:SOURCE": [
+                {
+                    "name": endpoint_name,
+                    "domain": {
+                        "name": domains.get("data_assets"),
+                        "community": {
+                            "name": community_name
+                        }
+                    }
+                }
+            ]
+        }
+    }
+
 def process_responses(title, endpoint_name, responses, community_name, domains):
     responses_assets = []
     for response_code, response_content in responses.items():  # Renamed 'response' to 'response_code' for clarity
@@ -309,29 +534,44 @@ def create_response_asset(title, endpoint_name, code_name, code_description, com
         }
     }
 
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or greater, got {number}")
+    return number
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import an OpenAPI specification into Collibra.")
+    parser.add_argument('json_file_path', help="Path to the OpenAPI JSON file")
+    parser.add_argument('--config', default='config.json', help="Path to the configuration file")
+    parser.add_argument('--chunk-size', type=non_negative_int, default=0, help="Maximum number of resources per import job (default: one job)")
+    parser.add_argument('--dry-run', action='store_true', help="Build the import data without sending it to Collibra")
+    add_target_arguments(parser)
+    add_logging_arguments(parser)
+    return parser.parse_args(argv)
+
 def main():
-    if len(sys.argv) != 2:
-        logger.error("Usage: python openapi.py <path_to_json_file>")
-        return
+    args = parse_args()
+    setup_logger(args)
 
-    json_file_path = sys.argv[1]
+    json_file_path = args.json_file_path
     logger.info(f"Processing file: {json_file_path}")
 
     json_data = read_json_file(json_file_path)
     if json_data is None:
         return
 
-    config_data = read_config_file('config.json')
+    config_data = read_config_file(args.config)
     if config_data is None:
         return
 
     domains = config_data.get("domains")
     community_name = config_data.get("community_name")
-    properties = {
-        'url': config_data.get("url", ""),
-        'username': config_data.get("username", ""),
-        'password': config_data.get("password", "")
-    }
+    try:
+        targets = read_targets(config_data, args.targets)
+    except ValueError as e:
+        logger.error(e)
+        return
 
     import_data = []
 
@@ -365,7 +605,11 @@ def main():
     import_data.extend(process_schemas(json_data, domains.get("data_assets"), community_name))
     import_data.extend(process_paths(json_data, title, config_data, community_name, domains))
 
-    send_import_data(import_data, properties)
+    if args.dry_run:
+        logger.info(f"Dry run: {len(import_data)} resources built, nothing sent")
+        return
+
+    send_to_targets(import_data, targets, args.chunk_size)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
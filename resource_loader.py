@@ -0,0 +1,211 @@
+import os
+import json
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Category -> (directory, required fields and their types)
+RESOURCE_SCHEMAS = {
+    'assets': ('resources/AssetType', {'name': str, 'symbol_type': str, 'display_name_enabled': bool, 'rating_enabled': bool}),
+    'communities': ('resources/Community', {'name': str}),
+    'domains': ('resources/Domain', {'name': str, 'community_id': str, 'type_id': str}),
+    'relation_types': ('resources/RelationType', {'source_type_id': str, 'role': str, 'target_type_id': str, 'co_role': str}),
+    'assignments': ('resources/Assignment', {'asset_type_id': str, 'status_ids': list, 'default_status_id': str})
+}
+
+# Category -> {field: category the id must belong to}. Ids missing from the local
+# files may already exist in Collibra, so unknown references are only warnings.
+RESOURCE_REFERENCES = {
+    'assets': {'parent_id': 'assets'},
+    'communities': {'parent_id': 'communities'},
+    'domains': {'community_id': 'communities'},
+    'relation_types': {'source_type_id': 'assets', 'target_type_id': 'assets'},
+    'assignments': {'asset_type_id': 'assets'}
+}
+
+# Out-of-the-box Collibra resources are not part of the operating model files
+BUILTIN_ID_PREFIX = '00000000-0000-0000-'
+
+CACHE_FILE = '.resource_cache.json'
+CACHE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+# The cache keeps only fingerprints (mtime, size, sha256), the validation outcome
+# and the id/reference fields, never the parsed content: re-reading a copy of
+# the data would cost as much as parsing the resource file itself.
+def read_cache(cache_path):
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION or not isinstance(cache.get('files'), dict):
+        return {}
+    return {path: entry for path, entry in cache['files'].items() if is_valid_cache_entry(entry)}
+
+def is_valid_cache_entry(entry):
+    return (
+        isinstance(entry, dict)
+        and type(entry.get('mtime')) is int
+        and type(entry.get('size')) is int
+        and isinstance(entry.get('hash'), str)
+        and isinstance(entry.get('errors'), list)
+        and isinstance(entry.get('summary'), dict)
+    )
+
+def write_cache(cache_path, files):
+    # The cache is optional, so failing to write it must not stop the install
+    temp_path = cache_path + '.tmp'
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'files': files}, f)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logger.warning("Could not write resource cache %s: %s", cache_path, e)
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def summarize(category, data):
+    fields = ['id', *RESOURCE_REFERENCES.get(category, {})]
+    return {field: data[field] for field in fields if field in data}
+
+def inspect_file(category, file_path, cache):
+    # Returns (cache entry, parsed data or None, read error). Without a cache the
+    # file is always parsed. With one, an unchanged mtime and size skips reading
+    # and validation, and a touched file with the same sha256 skips parsing.
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        return None, None, f"File {file_path} could not be read: {e}"
+
+    cached = cache.get(file_path) if cache is not None else None
+    if cached is not None and cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+        return cached, None, None
+
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    except OSError as e:
+        return None, None, f"File {file_path} could not be read: {e}"
+
+    digest = hashlib.sha256(content).hexdigest() if cache is not None else None
+    if cached is not None and cached['hash'] == digest:
+        return dict(cached, mtime=stat.st_mtime_ns, size=stat.st_size), None, None
+
+    try:
+        data = json.loads(content)
+    except ValueError:
+        data = None
+        errors = [f"File {file_path} is not a valid JSON"]
+    else:
+        errors = validate_fields(file_path, data, RESOURCE_SCHEMAS[category][1])
+
+    entry = {
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'hash': digest,
+        'errors': errors,
+        'summary': {} if errors else summarize(category, data)
+    }
+    return entry, None if errors else data, None
+
+def validate_fields(file_path, data, required_fields):
+    if not isinstance(data, dict):
+        return [f"File {file_path} does not contain a JSON object"]
+
+    missing_fields = [field for field in required_fields if field not in data]
+    if missing_fields:
+        return [f"File {file_path} is missing required fields: {missing_fields}"]
+
+    return [
+        f"File {file_path} field '{field}' should be {expected_type.__name__}, got {type(data[field]).__name__}"
+        for field, expected_type in required_fields.items()
+        if not isinstance(data[field], expected_type)
+    ]
+
+def list_resource_files():
+    files = []
+    for category, (directory_path, _) in RESOURCE_SCHEMAS.items():
+        if not os.path.exists(directory_path):
+            continue
+        for filename in sorted(os.listdir(directory_path)):
+            if filename.endswith('.json'):
+                files.append((category, os.path.join(directory_path, filename)))
+    return files
+
+# Parses and validates every resource file before any API call. Returns the valid
+# resources, the error messages grouped by failing file, and the warning messages,
+# all keyed by category. A full load has to read every file anyway, so the cache is
+# only used with load_data=False, where each valid resource is its id/reference
+# summary and unchanged files are not read at all.
+# known_ids lists ids that exist in Collibra but are not part of the local files.
+def load_resources(max_workers=None, cache_path=CACHE_FILE, known_ids=(), load_data=True):
+    if load_data:
+        cache_path = None
+    cache = read_cache(cache_path) if cache_path else None
+    files = list_resource_files()
+    workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+
+    # Files are handed to the pool in batches; a future per file costs more than
+    # inspecting a small resource file
+    batch_size = max(1, len(files) // (workers * 4))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+        inspected = [
+            result
+            for batch_results in executor.map(
+                lambda batch: [inspect_file(category, file_path, cache) for category, file_path in batch],
+                batches
+            )
+            for result in batch_results
+        ]
+
+    resources = {category: [] for category in RESOURCE_SCHEMAS}
+    errors = {category: {} for category in RESOURCE_SCHEMAS}
+    warnings = {category: [] for category in RESOURCE_SCHEMAS}
+    known_ids = set(known_ids)
+    new_cache = {}
+    candidates = []
+    for (category, file_path), (entry, data, error) in zip(files, inspected):
+        if error:
+            errors[category][file_path] = [error]
+            continue
+        new_cache[file_path] = entry
+        if entry['errors']:
+            errors[category][file_path] = entry['errors']
+        else:
+            candidates.append((category, file_path, entry['summary'], data if load_data else entry['summary']))
+
+    # Index ids once so cross-references are checked in a single pass
+    index = {}
+    for category, file_path, summary, _ in candidates:
+        if isinstance(summary.get('id'), str):
+            index.setdefault(category, {}).setdefault(summary['id'], []).append(file_path)
+
+    for category, file_path, summary, resource in candidates:
+        reference_errors = []
+        if isinstance(summary.get('id'), str) and len(index[category][summary['id']]) > 1:
+            reference_errors.append(f"File {file_path} has an id shared with {index[category][summary['id']]}")
+        for field, target_category in RESOURCE_REFERENCES.get(category, {}).items():
+            ref = summary.get(field)
+            if ref is None:
+                continue
+            if not isinstance(ref, str):
+                reference_errors.append(f"File {file_path} field '{field}' should be str, got {type(ref).__name__}")
+            elif not ref.startswith(BUILTIN_ID_PREFIX) and ref not in known_ids and ref not in index.get(target_category, {}):
+                warnings[category].append(f"File {file_path} field '{field}' references id {ref} that is not in the local {target_category} files")
+        if reference_errors:
+            errors[category][file_path] = reference_errors
+        else:
+            resources[category].append(resource)
+
+    if cache is not None:
+        cache_changed = new_cache.keys() != cache.keys() or any(entry is not cache[path] for path, entry in new_cache.items())
+        if cache_changed:
+            write_cache(cache_path, new_cache)
+
+    return resources, errors, warnings
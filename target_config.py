@@ -0,0 +1,28 @@
+# A single top-level url/username/password is treated as one target named "default"
+def read_targets(config_data, selected_names=None):
+    targets = config_data.get("targets")
+    if not targets:
+        targets = [{
+            'name': 'default',
+            'url': config_data.get("url", ""),
+            'username': config_data.get("username", ""),
+            'password': config_data.get("password", "")
+        }]
+
+    for position, target in enumerate(targets):
+        if not isinstance(target, dict) or not target.get('name'):
+            raise ValueError(f"Entry {position + 1} in targets has no name")
+
+    if selected_names:
+        unknown = set(selected_names) - {target['name'] for target in targets}
+        if unknown:
+            raise ValueError(f"Unknown targets: {sorted(unknown)}")
+        targets = [target for target in targets if target['name'] in selected_names]
+
+    return targets
+
+def target_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+def add_target_arguments(parser):
+    parser.add_argument('--targets', type=target_names, help="Comma separated target names to import into (default: all)")